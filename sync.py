@@ -1,36 +1,81 @@
 import os
 import platform
-import re
+import shutil
+import stat
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import dotbot
-from glob import glob
+from glob import iglob
 
 IS_WINDOWS = (platform.system().lower() == 'windows')
+
+# Batches at least this large go through `rsync --files-from=-`, which
+# amortizes one process spawn over the whole file list.
+_FILES_FROM_THRESHOLD = 16
+
+# Characters that make a path expression a glob pattern
+_GLOB_MAGIC = frozenset('*?[')
+
+
+def _is_remote(path):
+    """
+    True if rsync would treat `path` as a remote spec (host:path or
+    user@host:path): a ':' before the first slash, excluding Windows
+    drive-letter prefixes like C:/ or C:\\.
+    """
+    colon = path.find(':')
+    if colon == -1:
+        return False
+    # Drive letter ("C:", "C:/...", "C:\...")
+    if colon == 1 and path[0].isalpha():
+        return False
+    slash = path.replace('\\', '/').find('/')
+    return slash == -1 or colon < slash
 if not IS_WINDOWS:
     import pwd
     import grp
 
+    # Name->id lookups go through libc's NSS (possibly LDAP/SSSD), so
+    # cache them instead of paying the round-trip once per record.
+    @lru_cache(maxsize=64)
+    def _uid_of(name):
+        return pwd.getpwnam(name).pw_uid
+
+    @lru_cache(maxsize=64)
+    def _gid_of(name):
+        return grp.getgrnam(name).gr_gid
+
+@lru_cache(maxsize=256)
 def _fix_windows_path_for_cwrsync(path):
     """
     Convert Windows-style paths like C:\\Users\\Name\\... into
     /cygdrive/c/Users/Name/... so that cwRsync doesn't interpret
-    them as remote targets.
+    them as remote targets. Cached since the same base directory is
+    rewritten repeatedly.
     """
-    if not IS_WINDOWS:
-        return path  # Not on Windows, no rewriting
+    # Already-converted paths pass straight through
+    if path.startswith('/cygdrive/'):
+        return path
 
     # 1) Normalize backslashes to forward slashes
-    path = path.replace('\\', '/')
+    if '\\' in path:
+        path = path.replace('\\', '/')
 
     # 2) Convert "C:/Users/..." => "/cygdrive/c/Users/..."
-    match = re.match(r'^([A-Za-z]):/(.*)$', path)
-    if match:
-        drive_letter = match.group(1).lower()  # e.g. 'c'
-        rest = match.group(2)                  # e.g. 'Users/Davide/...'
-        path = f'/cygdrive/{drive_letter}/{rest}'
+    if (len(path) >= 2 and path[1] == ':' and path[0].isalpha()
+            and (len(path) == 2 or path[2] == '/')):
+        rest = path[3:] if len(path) > 2 else ''
+        path = f'/cygdrive/{path[0].lower()}/{rest}'
 
     return path
 
+
+# On Unix the converter is a no-op, so bind it out once at import time
+# instead of branching on IS_WINDOWS at every call site.
+_fix = _fix_windows_path_for_cwrsync if IS_WINDOWS else (lambda path: path)
+
 class Sync(dotbot.Plugin):
     '''
     Sync dotfiles using rsync (works with cwRsync on Windows).
@@ -38,6 +83,13 @@ class Sync(dotbot.Plugin):
 
     _directive = 'sync'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # binary name -> absolute path, filled lazily via shutil.which
+        self._rsync_path_cache = {}
+        # dotbot's logger is not documented thread-safe, so serialize it
+        self._log_lock = threading.Lock()
+
     def can_handle(self, directive):
         return directive == self._directive
 
@@ -50,105 +102,171 @@ class Sync(dotbot.Plugin):
     def expand_path(path, globs=False):
         path = os.path.expanduser(path)
         path = os.path.expandvars(path)
-        return glob(path) if globs else [path]
+        if not globs:
+            return [path]
+        # Plain paths need no directory walk at all; patterns go through
+        # the scandir-backed iglob generator instead of materializing
+        # every intermediate listing.
+        if not _GLOB_MAGIC.intersection(path):
+            return [path]
+        return list(iglob(path))
 
     def _chmodown(self, path, chmod, uid, gid):
         """Set file mode and ownership, skipping chown on Windows."""
         try:
             os.chmod(path, chmod)
         except Exception as e:
-            self._log.warning(f"Failed to chmod {path} to {oct(chmod)}: {e}")
+            with self._log_lock:
+                self._log.warning(f"Failed to chmod {path} to {oct(chmod)}: {e}")
 
         if not IS_WINDOWS:
             try:
                 os.chown(path, uid, gid)
             except Exception as e:
-                self._log.warning(
-                    f"Failed to chown {path} to uid={uid}, gid={gid}: {e}"
-                )
+                with self._log_lock:
+                    self._log.warning(
+                        f"Failed to chown {path} to uid={uid}, gid={gid}: {e}"
+                    )
 
     def _process_records(self, records):
         success = True
         defaults = self._context.defaults().get('sync', {})
+        base = self._context.base_directory()
 
-        for destination, source in records.items():
-            # Expand the single destination
-            (destination,) = self.expand_path(destination, globs=False)
-
-            # Get defaults
-            rsync = defaults.get('rsync', 'rsync')
-            options = defaults.get('options', ['--delete', '--safe-links'])
-            create = defaults.get('create', False)
-            fmode = defaults.get('fmode', 644)
-            dmode = defaults.get('dmode', 755)
-
-            if not IS_WINDOWS:
-                default_owner = pwd.getpwuid(os.getuid()).pw_name
-                default_group = grp.getgrgid(os.getgid()).gr_name
-            else:
-                # On Windows, just pick the current username or None
-                default_owner = os.getlogin()
-                default_group = None
-
-            owner = defaults.get('owner', default_owner)
-            group = defaults.get('group', default_group)
-
-            # By default, show both stdout/stderr
-            stdout = None
-            stderr = None
-
-            # If `source` is a dict, that means extended config
-            if isinstance(source, dict):
-                create = source.get('create', create)
-                rsync = source.get('rsync', rsync)
-                options = source.get('options', options)
-                fmode = source.get('fmode', fmode)
-                dmode = source.get('dmode', dmode)
-                owner = source.get('owner', owner)
-                group = source.get('group', group)
-                paths_expression = source['path']
-
-                if source.get('stdout', defaults.get('stdout', True)) is False:
-                    stdout = open(os.devnull, 'w')
-                if source.get('stderr', defaults.get('stderr', True)) is False:
-                    stderr = open(os.devnull, 'w')
+        # The process's own user/group rarely changes mid-run; resolve
+        # the defaults once instead of once per record.
+        if not IS_WINDOWS:
+            default_owner = pwd.getpwuid(os.getuid()).pw_name
+            default_group = grp.getgrgid(os.getgid()).gr_name
+        else:
+            # On Windows, just pick the current username or None
+            default_owner = os.getlogin()
+            default_group = None
+
+        # rsync is I/O-bound and releases the GIL while blocked in
+        # subprocess, so independent destinations can run concurrently.
+        if records:
+            max_workers = defaults.get('parallel', min(8, len(records)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._process_one, base, destination, source, defaults,
+                        default_owner, default_group
+                    )
+                    for destination, source in records.items()
+                ]
+                # No all(): it would short-circuit on the first False
+                # and never retrieve (or surface) later workers' results
+                for f in as_completed(futures):
+                    success &= f.result()
+
+        with self._log_lock:
+            if success:
+                self._log.info('All synchronizations have been done')
             else:
-                paths_expression = source
+                self._log.error('Some synchronizations were not successful')
+        return success
 
-            # Convert owner/group to uid/gid if on Unix
-            if not IS_WINDOWS:
-                uid = pwd.getpwnam(owner).pw_uid if owner else -1
-                gid = grp.getgrnam(group).gr_gid if group else -1
-            else:
-                uid = -1
-                gid = -1
+    def _process_one(self, base, destination, source, defaults,
+                     default_owner, default_group):
+        success = True
+
+        # Expand the single destination (once; the helpers below take
+        # the expanded form as-is)
+        (destination,) = self.expand_path(destination, globs=False)
+
+        # Get defaults
+        rsync = defaults.get('rsync', 'rsync')
+        options = defaults.get('options', ['--delete', '--safe-links'])
+        create = defaults.get('create', False)
+        fmode = defaults.get('fmode', 644)
+        dmode = defaults.get('dmode', 755)
+        local_fast = defaults.get('local_fast', True)
+
+        owner = defaults.get('owner', default_owner)
+        group = defaults.get('group', default_group)
+
+        # By default, show both stdout/stderr
+        stdout = None
+        stderr = None
+
+        # If `source` is a dict, that means extended config
+        if isinstance(source, dict):
+            create = source.get('create', create)
+            rsync = source.get('rsync', rsync)
+            options = source.get('options', options)
+            fmode = source.get('fmode', fmode)
+            dmode = source.get('dmode', dmode)
+            owner = source.get('owner', owner)
+            group = source.get('group', group)
+            local_fast = source.get('local_fast', local_fast)
+            paths_expression = source['path']
+
+            # The DEVNULL sentinel needs no open/close and is safe to
+            # share across tasks
+            if source.get('stdout', defaults.get('stdout', True)) is False:
+                stdout = subprocess.DEVNULL
+            if source.get('stderr', defaults.get('stderr', True)) is False:
+                stderr = subprocess.DEVNULL
+        else:
+            paths_expression = source
+
+        # Resolve the rsync binary once per name: a missing binary gives
+        # one clear error instead of a FileNotFoundError per record, and
+        # an absolute argv[0] spares every exec the PATH search.
+        if rsync not in self._rsync_path_cache:
+            resolved = shutil.which(rsync)
+            if resolved is None:
+                raise RuntimeError(f"rsync binary '{rsync}' not found on PATH")
+            self._rsync_path_cache[rsync] = resolved
+        rsync = self._rsync_path_cache[rsync]
+
+        # Convert owner/group to uid/gid if on Unix
+        if not IS_WINDOWS:
+            uid = _uid_of(owner) if owner else -1
+            gid = _gid_of(group) if group else -1
+        else:
+            uid = -1
+            gid = -1
 
-            # Create the parent folder if needed
-            if create:
-                success &= self._create(destination, int('%s' % dmode, 8), uid, gid)
+        # Create the parent folder if needed
+        if create:
+            success &= self._create(destination, int('%s' % dmode, 8), uid, gid)
 
-            paths = self.expand_path(paths_expression, globs=True)
-            if len(paths) > 1:
+        paths = self.expand_path(paths_expression, globs=True)
+        if len(paths) > 1:
+            with self._log_lock:
                 self._log.lowinfo(
                     f'Synchronizing expression {paths_expression} -> {destination}'
                 )
 
-            for path_item in paths:
-                success &= self._sync(
-                    path_item, destination, dmode, fmode, owner, group,
-                    rsync, options, stdout, stderr
-                )
+        # Local-to-local transfers gain nothing from rsync's delta
+        # algorithm, so copy whole files in place unless the user opted
+        # out via local_fast or already set the flags themselves
+        if (local_fast and not _is_remote(paths_expression)
+                and not _is_remote(destination)):
+            extra = [f for f in ('--whole-file', '--inplace')
+                     if f not in options]
+            if extra:
+                options = extra + list(options)
+
+        # The argv prefix is invariant across this record's sources;
+        # build it once and let the helpers only append paths.
+        base_cmd = tuple(c for c in (
+            rsync,
+            '--update',
+            '--recursive',
+            '--owner',
+            '--group',
+            f'--chown={owner}:{group}' if (owner and group) else '',
+            f'--chmod=D{dmode},F{fmode}',
+        ) if c) + tuple(options)
 
-            # Close any file handles if we opened devnull
-            if isinstance(stdout, type(open(os.devnull))):
-                stdout.close()
-            if isinstance(stderr, type(open(os.devnull))):
-                stderr.close()
+        if paths:
+            success &= self._sync_many(
+                base, paths, destination, base_cmd, stdout, stderr
+            )
 
-        if success:
-            self._log.info('All synchronizations have been done')
-        else:
-            self._log.error('Some synchronizations were not successful')
         return success
 
     def _create(self, path, dmode, uid, gid):
@@ -158,15 +276,226 @@ class Sync(dotbot.Plugin):
             try:
                 os.mkdir(parent, dmode)
                 self._chmodown(parent, dmode, uid, gid)
+            except FileExistsError:
+                # A concurrent record sharing this parent won the race
+                # between the exists check and the mkdir; that's fine
+                pass
             except Exception as e:
-                self._log.warning(f'Failed to create directory {parent}. {e}')
+                with self._log_lock:
+                    self._log.warning(f'Failed to create directory {parent}. {e}')
                 success = False
             else:
-                self._log.lowinfo(f'Creating directory {parent}')
+                with self._log_lock:
+                    self._log.lowinfo(f'Creating directory {parent}')
         return success
 
-    def _sync(self, source, destination, dmode, fmode, owner, group,
-              rsync, options, stdout, stderr):
+    def _run_rsync(self, full_cmd, base, stdout, stderr, input_bytes=None):
+        """
+        Runs one rsync process and returns its exit code. When the
+        caller has not redirected stdout, the output is forwarded to the
+        logger line by line as it arrives, so long transfers show
+        progress instead of appearing hung (and never accumulate in
+        memory). `input_bytes` is streamed to stdin for --files-from=-.
+
+        Note: passing cwd keeps subprocess on fork/vfork+exec; CPython
+        only uses os.posix_spawn when cwd is None and close_fds is off.
+        """
+        stdin = subprocess.PIPE if input_bytes is not None else None
+
+        if stdout is not None:
+            proc = subprocess.Popen(
+                full_cmd, stdin=stdin, stdout=stdout, stderr=stderr, cwd=base
+            )
+            proc.communicate(input_bytes)
+            return proc.returncode
+
+        proc = subprocess.Popen(
+            full_cmd,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if stderr is None else stderr,
+            cwd=base
+        )
+
+        # Feed stdin from a separate thread so a child blocked writing
+        # its output can never deadlock against us writing its input
+        writer = None
+        if input_bytes is not None:
+            def _feed():
+                # A child that dies before draining stdin breaks the
+                # pipe; its exit code already reports the failure, so
+                # don't let the feeder thread crash (communicate()
+                # swallows this the same way)
+                try:
+                    proc.stdin.write(input_bytes)
+                except BrokenPipeError:
+                    pass
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+            writer = threading.Thread(target=_feed)
+            writer.start()
+
+        for line in proc.stdout:
+            line = line.decode(errors='replace').rstrip()
+            if line:
+                with self._log_lock:
+                    self._log.lowinfo(line)
+        proc.stdout.close()
+        if writer is not None:
+            writer.join()
+        return proc.wait()
+
+    def _sync_many(self, base, sources, dest_abs, base_cmd, stdout, stderr):
+        """
+        Synchronizes several sources to one destination with a single
+        rsync invocation (rsync accepts SRC... DEST), saving one process
+        startup per extra source. Returns True if successful.
+        """
+        # Remote specs cannot be stat'ed or safely mixed into one argv,
+        # so fall back to one invocation per path there.
+        if any(_is_remote(source) for source in sources):
+            success = True
+            for source in sources:
+                success &= self._sync(
+                    base, source, dest_abs, base_cmd, stdout, stderr
+                )
+            return success
+
+        success = False
+
+        # One lstat per source answers both "is it a directory" (trailing
+        # slash for content copies) and "does it exist" — without
+        # following links, so a dangling symlink stays in the batch for
+        # rsync to handle. Genuinely missing paths are warned about and
+        # skipped instead of failing the whole record.
+        sources_native = []
+        stats = []
+        for source in sources:
+            source_abs = os.path.join(base, source)
+            try:
+                source_stat = os.lstat(source_abs)
+            except FileNotFoundError:
+                with self._log_lock:
+                    self._log.warning(
+                        f"Skipping {source_abs} -> {dest_abs}: "
+                        f"source does not exist"
+                    )
+                continue
+            except OSError as e:
+                # e.g. NotADirectoryError or PermissionError: fail the
+                # record with a warning, don't crash the run
+                with self._log_lock:
+                    self._log.warning(
+                        f"Failed to sync {source_abs} -> {dest_abs}: {e}"
+                    )
+                return False
+            sources_native.append(source_abs)
+            stats.append(source_stat)
+
+        if not sources_native:
+            return True
+
+        # Large batches of plain files below one directory stream through
+        # a single --files-from=- invocation instead; restricting the
+        # route to same-parent non-directories keeps the destination
+        # layout identical to the SRC... DEST form.
+        if len(sources_native) >= _FILES_FROM_THRESHOLD:
+            parents = {os.path.dirname(p) for p in sources_native}
+            if len(parents) == 1 and not any(stat.S_ISDIR(s.st_mode) for s in stats):
+                (common_base,) = parents
+                rel_paths = [os.path.basename(p) for p in sources_native]
+                return self._sync_files_from(
+                    base, common_base, rel_paths, dest_abs, base_cmd,
+                    stdout, stderr
+                )
+
+        sources_abs = []
+        for source_abs, source_stat in zip(sources_native, stats):
+            is_dir = stat.S_ISDIR(source_stat.st_mode)
+            source_abs = _fix(source_abs)
+            # Append a slash per directory source (for copying contents)
+            if is_dir and not source_abs.endswith('/'):
+                source_abs += '/'
+            sources_abs.append(source_abs)
+
+        dest_abs = _fix(dest_abs)
+
+        full_cmd = list(base_cmd) + sources_abs + [dest_abs]
+
+        try:
+            returncode = self._run_rsync(full_cmd, base, stdout, stderr)
+            if returncode != 0:
+                with self._log_lock:
+                    self._log.warning(
+                        f"Failed to sync {len(sources_abs)} paths -> {dest_abs}\n"
+                        f"Exit code: {returncode}"
+                    )
+            else:
+                success = True
+                with self._log_lock:
+                    if len(sources_abs) == 1:
+                        self._log.lowinfo(
+                            f"Synchronized {sources_abs[0]} -> {dest_abs}"
+                        )
+                    else:
+                        self._log.lowinfo(
+                            f"Synchronized {len(sources_abs)} paths -> {dest_abs}"
+                        )
+        except Exception as e:
+            with self._log_lock:
+                self._log.warning(
+                    f"Failed to sync {len(sources_abs)} paths -> {dest_abs}. "
+                    f"Exception: {e}"
+                )
+
+        return success
+
+    def _sync_files_from(self, base, common_base, rel_paths, dest_abs,
+                         base_cmd, stdout, stderr):
+        """
+        Synchronizes many files below one base directory by streaming
+        their NUL-separated relative paths into a single
+        `rsync --files-from=- --from0` process, so N files cost one
+        spawn instead of N. Returns True if successful.
+        """
+        success = False
+        src_base = _fix(common_base)
+        dest_abs = _fix(dest_abs)
+
+        full_cmd = list(base_cmd) + ['--files-from=-', '--from0',
+                                     src_base, dest_abs]
+
+        try:
+            returncode = self._run_rsync(
+                full_cmd, base, stdout, stderr,
+                input_bytes=b'\0'.join(p.encode() for p in rel_paths)
+            )
+            if returncode != 0:
+                with self._log_lock:
+                    self._log.warning(
+                        f"Failed to sync {len(rel_paths)} paths from "
+                        f"{src_base} -> {dest_abs}\n"
+                        f"Exit code: {returncode}"
+                    )
+            else:
+                success = True
+                with self._log_lock:
+                    self._log.lowinfo(
+                        f"Synchronized {len(rel_paths)} paths from "
+                        f"{src_base} -> {dest_abs}"
+                    )
+        except Exception as e:
+            with self._log_lock:
+                self._log.warning(
+                    f"Failed to sync {len(rel_paths)} paths from "
+                    f"{src_base} -> {dest_abs}. Exception: {e}"
+                )
+
+        return success
+
+    def _sync(self, base, source, dest_abs, base_cmd, stdout, stderr):
         """
         Synchronizes source to destination with cwRsync.
         Returns True if successful.
@@ -174,56 +503,61 @@ class Sync(dotbot.Plugin):
         success = False
 
         # Expand relative paths
-        source_abs = os.path.join(self._context.base_directory(), source)
-        dest_abs = os.path.expanduser(destination)
+        source_abs = os.path.join(base, source)
+
+        # One lstat answers both the directory check and existence
+        # without following links; remote specs cannot be stat'ed and
+        # are left to rsync. Missing paths are skipped (not failed),
+        # like the old glob expansion dropped them.
+        source_stat = None
+        if not _is_remote(source):
+            try:
+                source_stat = os.lstat(source_abs)
+            except FileNotFoundError:
+                with self._log_lock:
+                    self._log.warning(
+                        f"Skipping {source_abs} -> {dest_abs}: "
+                        f"source does not exist"
+                    )
+                return True
+            except OSError as e:
+                # e.g. NotADirectoryError or PermissionError: fail the
+                # record with a warning, don't crash the run
+                with self._log_lock:
+                    self._log.warning(
+                        f"Failed to sync {source_abs} -> {dest_abs}: {e}"
+                    )
+                return False
 
         # Convert "C:\Users\..." -> "/cygdrive/c/Users/..." on Windows
-        if IS_WINDOWS:
-            source_abs = _fix_windows_path_for_cwrsync(source_abs)
-            dest_abs = _fix_windows_path_for_cwrsync(dest_abs)
-
-        # Build rsync command
-        cmd = [
-            rsync,
-            '--update',
-            '--recursive',
-            '--owner',
-            '--group',
-            f'--chown={owner}:{group}' if (owner and group) else '',
-            f'--chmod=D{dmode},F{fmode}'
-        ]
-        # Remove empty strings if any
-        cmd = [c for c in cmd if c]
+        source_abs = _fix(source_abs)
+        dest_abs = _fix(dest_abs)
 
         # If source is a directory, append a slash (for copying contents)
-        original_source_full = os.path.join(self._context.base_directory(), source)
-        if os.path.isdir(original_source_full):
+        if source_stat is not None and stat.S_ISDIR(source_stat.st_mode):
             # e.g. /cygdrive/c/Users/Name/Documents/...
             if not source_abs.endswith('/'):
                 source_abs += '/'
 
-        full_cmd = cmd + options + [source_abs, dest_abs]
+        full_cmd = list(base_cmd) + [source_abs, dest_abs]
 
         try:
             #self._log.lowinfo("Running rsync command: " + " ".join(full_cmd))
-            ret = subprocess.run(
-                full_cmd,
-                stdout=stdout,
-                stderr=stderr,
-                cwd=self._context.base_directory(),
-                text=True
-            )
-            if ret.returncode != 0:
-                self._log.warning(
-                    f"Failed to sync {source_abs} -> {dest_abs}\n"
-                    f"Exit code: {ret.returncode}"
-                )
+            returncode = self._run_rsync(full_cmd, base, stdout, stderr)
+            if returncode != 0:
+                with self._log_lock:
+                    self._log.warning(
+                        f"Failed to sync {source_abs} -> {dest_abs}\n"
+                        f"Exit code: {returncode}"
+                    )
             else:
                 success = True
-                self._log.lowinfo(f"Synchronized {source_abs} -> {dest_abs}")
+                with self._log_lock:
+                    self._log.lowinfo(f"Synchronized {source_abs} -> {dest_abs}")
         except Exception as e:
-            self._log.warning(
-                f"Failed to sync {source_abs} -> {dest_abs}. Exception: {e}"
-            )
+            with self._log_lock:
+                self._log.warning(
+                    f"Failed to sync {source_abs} -> {dest_abs}. Exception: {e}"
+                )
 
         return success